@@ -0,0 +1,8 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load_env():
+    """Load variables from .env into the environment, once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
@@ -0,0 +1,9 @@
+import os
+
+
+def iter_files(dirpath, suffix):
+    """Yield a DirEntry for each file (or symlink to one) directly in dirpath ending with suffix."""
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            if entry.name.endswith(suffix) and entry.is_file():
+                yield entry
@@ -1,10 +1,25 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
 from serato_tools.usb_export import copy_crates_to_usb, get_crate_files
+from seratosync._env import load_env
+from seratosync._fs import iter_files
 
-load_dotenv()
+load_env()
+
+AUDIO_EXTS = frozenset({"mp3", "m4a", "flac", "wav"})
+
+
+def _tree_size(root):
+    """Return the total size in bytes of all regular files under root."""
+    total = 0
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                total += _tree_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
 
 
 class SeratoBackup:
@@ -52,34 +67,27 @@ class SeratoBackup:
         print(f"Music folder: {tracks_subfolder}")
 
         try:
-            # Get all crate files - get_crate_files() uses regex pattern on filenames
-            # Use ".*\.crate$" to match all .crate files
+            # Get all crate files. List Subcrates directly when it exists;
+            # otherwise let get_crate_files() apply its regex to filenames.
             if backup_all_crates:
                 crate_pattern = r".*\.crate$"  # Regex to match all .crate files
             else:
                 crate_pattern = r".*\.crate$"  # Can be customized
 
-            print(f"\nSearching for crates with pattern: {crate_pattern}")
-            crate_files = get_crate_files(crate_pattern)
+            subcrates_dir = self.source_path / "Subcrates"
+            if subcrates_dir.exists():
+                print(f"\nSearching for crates in: {subcrates_dir}")
+                crate_files = [e.path for e in iter_files(subcrates_dir, ".crate")]
+            else:
+                print(f"\nSearching for crates with pattern: {crate_pattern}")
+                crate_files = get_crate_files(crate_pattern)
 
             if not crate_files:
                 print("Warning: No crate files found.")
                 print("This might mean:")
                 print("  - Your Serato library has no crates")
                 print("  - The source path is incorrect")
-                print(f"  - Expected crates in: {self.source_path / 'Subcrates'}")
-
-                # List what's actually there
-                subcrates_dir = self.source_path / "Subcrates"
-                if subcrates_dir.exists():
-                    actual_crates = list(subcrates_dir.glob("*.crate"))
-                    if actual_crates:
-                        print(f"\nFound {len(actual_crates)} crate files manually:")
-                        for crate in actual_crates[:10]:
-                            print(f"  • {crate.name}")
-                        # Use these instead
-                        crate_files = [str(c) for c in actual_crates]
-                        print(f"\nUsing {len(crate_files)} crates found manually")
+                print(f"  - Expected crates in: {subcrates_dir}")
             else:
                 print(f"Found {len(crate_files)} crate(s)")
                 for crate in crate_files[:10]:
@@ -104,11 +112,7 @@ class SeratoBackup:
                 return None
 
             # Calculate backup size
-            total_size = sum(
-                f.stat().st_size
-                for f in self.target_path.rglob('*')
-                if f.is_file()
-            )
+            total_size = _tree_size(self.target_path)
             size_mb = total_size / (1024 * 1024)
             size_gb = size_mb / 1024
 
@@ -142,10 +146,10 @@ class SeratoBackup:
             # List crates
             subcrates_dir = serato_dir / "Subcrates"
             if subcrates_dir.exists():
-                crates = list(subcrates_dir.glob("*.crate"))
+                crates = [e.name.removesuffix(".crate") for e in iter_files(subcrates_dir, ".crate")]
                 print(f"✓ Found {len(crates)} crate(s)")
                 for crate in crates[:10]:  # Show first 10
-                    print(f"  • {crate.stem}")
+                    print(f"  • {crate}")
                 if len(crates) > 10:
                     print(f"  ... and {len(crates) - 10} more")
 
@@ -159,12 +163,14 @@ class SeratoBackup:
         for folder in music_folders:
             music_dir = self.target_path / folder
             if music_dir.exists():
-                music_files = list(music_dir.rglob("*.mp3")) + \
-                             list(music_dir.rglob("*.m4a")) + \
-                             list(music_dir.rglob("*.flac")) + \
-                             list(music_dir.rglob("*.wav"))
-                if music_files:
-                    print(f"✓ Found {len(music_files)} track(s) in '{folder}'")
+                track_count = sum(
+                    1
+                    for _, _, files in os.walk(music_dir)
+                    for name in files
+                    if name.rpartition('.')[2].lower() in AUDIO_EXTS
+                )
+                if track_count:
+                    print(f"✓ Found {track_count} track(s) in '{folder}'")
                     break
 
         return True
@@ -1,7 +1,7 @@
-from dotenv import load_dotenv
 from seratosync.metadata_sync import SeratoMetadataSync
+from seratosync._env import load_env
 
-load_dotenv()
+load_env()
 
 
 def main():
@@ -1,12 +1,59 @@
+import contextlib
+import functools
 import os
 import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
 from serato_tools.database_v2 import DatabaseV2
 from serato_tools.crate import Crate
 from serato_tools.smart_crate import SmartCrate
+from seratosync._env import load_env
+from seratosync._fs import iter_files
 
-load_dotenv()
+load_env()
+
+# Crate syncing is dominated by file IO, so oversubscribe the CPUs
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _copy_small_file(source, target):
+    """
+    Copy a small file's contents and timestamps with as few syscalls as possible.
+
+    Uses sendfile on Linux and shutil.copyfile elsewhere (which already copies
+    in the kernel on macOS). Permission bits are not copied.
+    """
+    st = os.stat(source)
+    if sys.platform.startswith('linux'):
+        src_fd = os.open(source, os.O_RDONLY)
+        try:
+            dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                offset = 0
+                while offset < st.st_size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    else:
+        shutil.copyfile(source, target)
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _remove_trees(paths, errors):
+    """Delete each directory tree in paths, appending (path, error) to errors on failure."""
+    for path in paths:
+        try:
+            shutil.rmtree(path)
+        except OSError as e:
+            errors.append((path, e))
 
 
 class SeratoMetadataSync:
@@ -20,6 +67,11 @@ class SeratoMetadataSync:
         self.target_drive = os.getenv('target', '/Volumes/sandisk')
         self.crate_prefix = os.getenv('crate_prefix', crate_prefix)
 
+        # remap_path runs once per track, so precompute the source prefix
+        # (without leading slash) it strips from every path
+        self._src_prefix = os.path.normpath(self.source_music).lstrip('/')
+        self._src_prefix_len = len(self._src_prefix)
+
         self.source_serato = Path(self.source_music) / "_Serato_"
         # Serato expects _Serato_ at the root of the drive, not inside Music folder
         self.target_serato = Path(self.target_drive) / "_Serato_"
@@ -50,112 +102,139 @@ class SeratoMetadataSync:
 
         Note: Serato stores paths without leading slashes in crate files.
         """
-        original_path = os.path.normpath(original_path)
+        # normpath is comparatively slow; only pay for it when the path
+        # contains something it would collapse (doubled slashes, "." or ".."
+        # segments, a trailing slash)
+        if ('//' in original_path or '/.' in original_path
+                or original_path.startswith('.') or original_path.endswith('/')):
+            original_path = os.path.normpath(original_path)
 
         # Remove leading slash if present for consistent handling
         original_path = original_path.lstrip('/')
 
-        # Remove the source music base path (without leading slash)
-        source_music_no_slash = self.source_music.lstrip('/')
-        if original_path.startswith(source_music_no_slash):
-            relative_part = original_path[len(source_music_no_slash):]
-            # Make it relative to the drive root (without leading slash)
-            new_path = "Music" + relative_part
-            return new_path
+        # Remove the source music base path (without leading slash) and make
+        # it relative to the drive root (without leading slash)
+        if original_path.startswith(self._src_prefix):
+            return "Music" + original_path[self._src_prefix_len:]
 
         # If path doesn't start with source, keep it as is
         return original_path
 
-    def sync_crates(self):
-        """Copy and update crate files."""
-        source_crates_dir = self.source_serato / "Subcrates"
-        target_crates_dir = self.target_serato / "Subcrates"
+    def _process_crate(self, crate_file, crate_cls, target_dir):
+        """
+        Remap the track paths of a single crate and save it to target_dir.
 
-        if not source_crates_dir.exists():
-            print("No Subcrates directory found")
-            return 0
+        Returns the name the crate was saved under.
+        """
+        new_name = f"{self.crate_prefix}{crate_file.name}" if self.crate_prefix else crate_file.name
+        crate = crate_cls(os.fspath(crate_file))
+        remap = self.remap_path
 
-        target_crates_dir.mkdir(parents=True, exist_ok=True)
+        def modify_track(track):
+            new_path = remap(track.relpath)
+            track.set_path(new_path)
+            return track
 
-        crate_files = list(source_crates_dir.glob("*.crate"))
-        print(f"\nProcessing {len(crate_files)} crate(s)...")
+        crate.modify_tracks(modify_track)
 
-        for crate_file in crate_files:
-            try:
-                crate = Crate(str(crate_file))
+        # Save to target with optional prefix
+        crate.save(str(target_dir / new_name))
+        return new_name
 
-                def modify_track(track: Crate.Track) -> Crate.Track:
-                    new_path = self.remap_path(track.relpath)
-                    track.set_path(new_path)
-                    return track
+    def _try_process_crate(self, crate_file, crate_cls, target_dir):
+        """
+        Run _process_crate, capturing any failure instead of raising.
+
+        Returns a (name, new_name, error) tuple; error is None on success.
+        """
+        try:
+            new_name = self._process_crate(crate_file, crate_cls, target_dir)
+        except Exception as e:
+            return crate_file.name, None, e
+        return crate_file.name, new_name, None
+
+    def _report_crate(self, out, name, new_name, error):
+        """Report the outcome of a single crate sync through out."""
+        if error is not None:
+            out(f"  ✗ {name}: {error}")
+        elif self.crate_prefix:
+            out(f"  ✓ {name} -> {new_name}")
+        else:
+            out(f"  ✓ {name}")
 
-                crate.modify_tracks(modify_track)
+    def _sync_crate_dir(self, source_dir, target_dir, suffix, crate_cls, label, out=print, executor=None):
+        """
+        Sync every crate file in source_dir ending with suffix into target_dir.
 
-                # Save to target with optional prefix
-                new_name = f"{self.crate_prefix}{crate_file.name}" if self.crate_prefix else crate_file.name
-                target_file = target_crates_dir / new_name
-                crate.save(str(target_file))
-                if self.crate_prefix:
-                    print(f"  ✓ {crate_file.name} -> {new_name}")
-                else:
-                    print(f"  ✓ {crate_file.name}")
+        Crates are processed on executor, or on a pool of our own if none is
+        given. Returns the number of crate files found.
+        """
+        count = 0
+
+        def crate_files():
+            nonlocal count
+            for entry in iter_files(source_dir, suffix):
+                count += 1
+                yield entry
+
+        # Each crate is written to its own target file, so they can be
+        # processed concurrently; results are reported in order afterwards.
+        # map() submits each crate as the scan finds it, so workers start
+        # before the listing is complete; the count is final once it returns.
+        with contextlib.ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=MAX_WORKERS))
+            results = executor.map(
+                lambda f: self._try_process_crate(f, crate_cls, target_dir),
+                crate_files(),
+            )
+            if count:
+                out(f"\nProcessing {count} {label}(s)...")
+            for result in results:
+                self._report_crate(out, *result)
 
-            except Exception as e:
-                print(f"  ✗ {crate_file.name}: {e}")
+        return count
 
-        return len(crate_files)
+    def sync_crates(self, out=print, executor=None):
+        """Copy and update crate files."""
+        source_crates_dir = self.source_serato / "Subcrates"
+        target_crates_dir = self.target_serato / "Subcrates"
+
+        if not source_crates_dir.exists():
+            out("No Subcrates directory found")
+            return 0
+
+        target_crates_dir.mkdir(parents=True, exist_ok=True)
 
-    def sync_smart_crates(self):
+        return self._sync_crate_dir(
+            source_crates_dir, target_crates_dir, ".crate", Crate, "crate", out, executor
+        )
+
+    def sync_smart_crates(self, out=print, executor=None):
         """Copy and update smart crate files."""
         source_smart_dir = self.source_serato / "SmartCrates"
         target_smart_dir = self.target_serato / "SmartCrates"
 
         if not source_smart_dir.exists():
-            print("No SmartCrates directory found")
+            out("No SmartCrates directory found")
             return 0
 
         target_smart_dir.mkdir(parents=True, exist_ok=True)
 
-        smart_crate_files = list(source_smart_dir.glob("*.scrate"))
-
-        if smart_crate_files:
-            print(f"\nProcessing {len(smart_crate_files)} smart crate(s)...")
-
-        for scrate_file in smart_crate_files:
-            try:
-                scrate = SmartCrate(str(scrate_file))
+        return self._sync_crate_dir(
+            source_smart_dir, target_smart_dir, ".scrate", SmartCrate, "smart crate", out, executor
+        )
 
-                def modify_track(track: SmartCrate.Track) -> SmartCrate.Track:
-                    new_path = self.remap_path(track.relpath)
-                    track.set_path(new_path)
-                    return track
-
-                scrate.modify_tracks(modify_track)
-
-                # Save as smart crate with updated paths and optional prefix
-                new_name = f"{self.crate_prefix}{scrate_file.name}" if self.crate_prefix else scrate_file.name
-                target_file = target_smart_dir / new_name
-                scrate.save(str(target_file))
-                if self.crate_prefix:
-                    print(f"  ✓ {scrate_file.name} -> {new_name}")
-                else:
-                    print(f"  ✓ {scrate_file.name}")
-
-            except Exception as e:
-                print(f"  ✗ {scrate_file.name}: {e}")
-
-        return len(smart_crate_files)
-
-    def sync_database(self):
+    def sync_database(self, out=print):
         """Copy and update the main Serato database."""
         source_db = self.source_serato / "database V2"
         target_db = self.target_serato / "database V2"
 
         if not source_db.exists():
-            print("No database V2 file found")
+            out("No database V2 file found")
             return
 
-        print("\nProcessing database...")
+        out("\nProcessing database...")
 
         try:
             db = DatabaseV2(str(source_db))
@@ -172,14 +251,15 @@ class SeratoMetadataSync:
             # Save to target
             self.target_serato.mkdir(parents=True, exist_ok=True)
             db.save(str(target_db))
-            print(f"  ✓ database V2")
+            out(f"  ✓ database V2")
 
         except Exception as e:
-            print(f"  ✗ database V2: {e}")
+            out(f"  ✗ database V2: {e}")
 
-    def sync_other_files(self):
+    def sync_other_files(self, out=print):
         """Copy other Serato preference and configuration files."""
-        print("\nCopying other Serato files...")
+        out("\nCopying other Serato files...")
+        self.target_serato.mkdir(parents=True, exist_ok=True)
 
         # Handle neworder.pref specially if we have a prefix
         source_neworder = self.source_serato / "neworder.pref"
@@ -202,12 +282,12 @@ class SeratoMetadataSync:
             target_neworder = self.target_serato / "neworder.pref"
             with open(target_neworder, 'wb') as f:
                 f.write(content.encode('utf-16-be'))
-            print(f"  ✓ neworder.pref (with prefix)")
+            out(f"  ✓ neworder.pref (with prefix)")
             copied = 1
         elif source_neworder.exists():
             target_neworder = self.target_serato / "neworder.pref"
-            shutil.copy2(source_neworder, target_neworder)
-            print(f"  ✓ neworder.pref")
+            _copy_small_file(source_neworder, target_neworder)
+            out(f"  ✓ neworder.pref")
             copied = 1
         else:
             copied = 0
@@ -222,30 +302,97 @@ class SeratoMetadataSync:
             source_file = self.source_serato / filename
             if source_file.exists():
                 target_file = self.target_serato / filename
-                shutil.copy2(source_file, target_file)
-                print(f"  ✓ {filename}")
+                _copy_small_file(source_file, target_file)
+                out(f"  ✓ {filename}")
                 copied += 1
 
         return copied
 
-    def sync_all(self):
-        """Perform a complete metadata sync."""
+    def _run_steps_parallel(self, steps):
+        """
+        Run independent sync steps concurrently and return their results in order.
+
+        Each step reports through its own list of lines. A step's lines are
+        printed as soon as it and every step before it have finished, so the
+        output reads the same as a serial run. If any step raises, all output
+        is still printed before the first exception is re-raised.
+        """
+        outputs = [[] for _ in steps]
+        results = []
+        error = None
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = [
+                executor.submit(step, out=lines.append)
+                for step, lines in zip(steps, outputs)
+            ]
+            for lines, future in zip(outputs, futures):
+                exc = future.exception()
+                for line in lines:
+                    print(line)
+                if exc is not None:
+                    error = error or exc
+                    results.append(None)
+                else:
+                    results.append(future.result())
+
+        if error is not None:
+            raise error
+        return results
+
+    def sync_all(self, parallel=True):
+        """
+        Perform a complete metadata sync.
+
+        Args:
+            parallel: If True, sync crates, smart crates, the database and
+                      preference files concurrently. They write to disjoint
+                      files under the target _Serato_ folder.
+        """
         print("=" * 60)
         print("Serato Metadata Sync")
         print("=" * 60)
 
         self.validate_paths()
 
-        # Remove existing Serato folder on target to start fresh
+        # Remove existing Serato folder on target to start fresh. Renaming is
+        # a single syscall, so move it into a uniquely named trash folder and
+        # delete it in the background while the sync runs. Trash left behind
+        # by an interrupted or failed earlier run is swept at the same time.
+        trash_dirs = [p for p in Path(self.target_drive).glob("_Serato_.old.*") if p.is_dir()]
         if self.target_serato.exists():
             print(f"\nRemoving existing Serato metadata at {self.target_serato}...")
-            shutil.rmtree(self.target_serato)
+            trash = Path(tempfile.mkdtemp(dir=self.target_drive, prefix="_Serato_.old."))
+            os.rename(self.target_serato, trash / "_Serato_")
+            trash_dirs.append(trash)
+
+        cleanup = None
+        cleanup_errors = []
+        if trash_dirs:
+            cleanup = threading.Thread(target=_remove_trees, args=(trash_dirs, cleanup_errors))
+            cleanup.start()
 
-        # Sync all components
-        crate_count = self.sync_crates()
-        smart_count = self.sync_smart_crates()
-        self.sync_database()
-        other_count = self.sync_other_files()
+        try:
+            # Sync all components
+            if parallel:
+                # Both crate steps share one pool so together they never run
+                # more than MAX_WORKERS crate writers against the drive
+                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as crate_executor:
+                    crate_count, smart_count, _, other_count = self._run_steps_parallel([
+                        functools.partial(self.sync_crates, executor=crate_executor),
+                        functools.partial(self.sync_smart_crates, executor=crate_executor),
+                        self.sync_database,
+                        self.sync_other_files,
+                    ])
+            else:
+                crate_count = self.sync_crates()
+                smart_count = self.sync_smart_crates()
+                self.sync_database()
+                other_count = self.sync_other_files()
+        finally:
+            if cleanup is not None:
+                cleanup.join()
+            for path, error in cleanup_errors:
+                print(f"\n⚠ Could not fully remove old Serato metadata at {path}: {error}")
 
         print("\n" + "=" * 60)
         print("✓ Metadata sync complete!")
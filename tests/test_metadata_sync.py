@@ -0,0 +1,141 @@
+import os
+import threading
+
+import pytest
+
+from seratosync import metadata_sync
+from seratosync.metadata_sync import SeratoMetadataSync
+
+
+@pytest.fixture
+def drive(tmp_path, monkeypatch):
+    """An empty source library and a target drive with its Music folder."""
+    source = tmp_path / "source"
+    (source / "_Serato_").mkdir(parents=True)
+    target = tmp_path / "usb"
+    (target / "Music").mkdir(parents=True)
+    monkeypatch.setenv('source_music', str(source))
+    monkeypatch.setenv('target', str(target))
+    monkeypatch.delenv('crate_prefix', raising=False)
+    return target
+
+
+def test_sync_all_sweeps_stale_trash(drive):
+    (drive / "_Serato_" / "Subcrates").mkdir(parents=True)
+    (drive / "_Serato_.old.123" / "Subcrates").mkdir(parents=True)
+    (drive / "_Serato_Backup").mkdir()
+
+    SeratoMetadataSync().sync_all()
+
+    assert not any(p.name.startswith("_Serato_.old.") for p in drive.iterdir())
+    assert not (drive / "_Serato_" / "Subcrates").exists()
+    assert (drive / "_Serato_Backup").is_dir()
+
+
+def test_sync_all_reports_cleanup_failure(drive, monkeypatch, capsys):
+    (drive / "_Serato_").mkdir()
+
+    def fail(path):
+        raise OSError("device busy")
+
+    monkeypatch.setattr(metadata_sync.shutil, "rmtree", fail)
+    SeratoMetadataSync().sync_all()
+
+    out = capsys.readouterr().out
+    assert "Could not fully remove old Serato metadata" in out
+    assert "device busy" in out
+
+
+def test_sync_all_cleans_up_when_a_step_fails(drive, monkeypatch):
+    (drive / "_Serato_").mkdir()
+    sync = SeratoMetadataSync()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(sync, "sync_database", fail)
+    with pytest.raises(RuntimeError):
+        sync.sync_all()
+
+    assert not any(p.name.startswith("_Serato_.old.") for p in drive.iterdir())
+
+
+@pytest.mark.parametrize('platform', ['linux', 'darwin'])
+def test_copy_small_file_copies_contents_and_mtime(tmp_path, monkeypatch, platform):
+    monkeypatch.setattr(metadata_sync.sys, 'platform', platform)
+    source = tmp_path / "window.pref"
+    source.write_bytes(b"\x00w\x00i\x00n" * 1000)
+    os.utime(source, ns=(1_600_000_000_000_000_000, 1_500_000_000_123_456_789))
+    target = tmp_path / "copy.pref"
+
+    metadata_sync._copy_small_file(source, target)
+
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    monkeypatch.setenv('source_music', '/Users/berrio/Music')
+    monkeypatch.setenv('target', '/Volumes/sandisk')
+    monkeypatch.delenv('crate_prefix', raising=False)
+    return SeratoMetadataSync()
+
+
+def test_remap_path_strips_source_prefix(sync):
+    assert sync.remap_path("Users/berrio/Music/DJ Music/track.mp3") == "Music/DJ Music/track.mp3"
+    assert sync.remap_path("/Users/berrio/Music/DJ Music/track.mp3") == "Music/DJ Music/track.mp3"
+
+
+def test_remap_path_keeps_paths_outside_source(sync):
+    assert sync.remap_path("Users/other/track.mp3") == "Users/other/track.mp3"
+    assert sync.remap_path("Music/DJ Music/track.mp3") == "Music/DJ Music/track.mp3"
+
+
+def test_remap_path_normalizes_like_normpath(sync):
+    assert sync.remap_path("Users/berrio/Music///DJ//track.mp3") == "Music/DJ/track.mp3"
+    assert sync.remap_path("Users/berrio/Music/./DJ/../track.mp3") == "Music/track.mp3"
+    assert sync.remap_path("Users/o/./j.mp3") == "Users/o/j.mp3"
+
+
+def test_remap_path_keeps_backslashes_in_filenames(sync):
+    assert sync.remap_path("Users/berrio/Music/g\\h.mp3") == "Music/g\\h.mp3"
+
+
+def test_remap_path_source_under_music(monkeypatch):
+    monkeypatch.setenv('source_music', '/Music/Library')
+    sync = SeratoMetadataSync()
+    assert sync.remap_path("Music/Library/DJ/a.mp3") == "Music/DJ/a.mp3"
+
+
+def test_run_steps_parallel_keeps_step_order(sync, capsys):
+    fast_done = threading.Event()
+
+    def slow(out):
+        fast_done.wait(5)
+        out("slow")
+        return "a"
+
+    def fast(out):
+        out("fast")
+        fast_done.set()
+        return "b"
+
+    assert sync._run_steps_parallel([slow, fast]) == ["a", "b"]
+    assert capsys.readouterr().out == "slow\nfast\n"
+
+
+def test_run_steps_parallel_prints_all_output_before_raising(sync, capsys):
+    def first(out):
+        out("first")
+
+    def failing(out):
+        out("second")
+        raise RuntimeError("boom")
+
+    def third(out):
+        out("third")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        sync._run_steps_parallel([first, failing, third])
+    assert capsys.readouterr().out == "first\nsecond\nthird\n"